@@ -0,0 +1,194 @@
+"""
+Módulo que integra un bucle de eventos de asyncio con el mainloop de Tkinter,
+para realizar varias descargas a la vez sin bloquear la interfaz.
+Por: Leandro Marquez
+Para: Programación V - UBA
+"""
+
+# Importación de bibliotecas necesarias
+import asyncio  # Para el bucle de eventos y las tareas concurrentes
+import queue  # Para la cola de solicitudes pendientes
+import threading  # Para los hilos que realizan las solicitudes
+from concurrent.futures import Future  # Resultado de cada solicitud
+import requests  # Para realizar solicitudes HTTP
+
+
+class EjecutorHilosDemonio:
+    """
+    Ejecutor mínimo con un número fijo de hilos demonio.
+
+    A diferencia de ThreadPoolExecutor, el intérprete no espera a sus hilos al terminar,
+    por lo que cerrar la ventana finaliza el programa aunque quede una solicitud en curso.
+    """
+
+    def __init__(self, max_workers):
+        """
+        Crea los hilos del ejecutor.
+
+        Parámetros:
+            max_workers (int): Cantidad de hilos
+        """
+        self.cola = queue.SimpleQueue()
+        self.hilos = [threading.Thread(target=self.trabajar, daemon=True) for _ in range(max_workers)]
+        for hilo in self.hilos:
+            hilo.start()
+
+    def trabajar(self):
+        """Ejecuta las funciones de la cola hasta recibir la señal de cierre (None)."""
+        while True:
+            tarea = self.cola.get()
+            if tarea is None:
+                return
+            futuro, funcion, args = tarea
+            # Omitir las solicitudes canceladas mientras esperaban en la cola
+            if not futuro.set_running_or_notify_cancel():
+                continue
+            try:
+                resultado = funcion(*args)
+            except BaseException as e:
+                futuro.set_exception(e)
+            else:
+                futuro.set_result(resultado)
+
+    def submit(self, funcion, *args):
+        """
+        Agrega una función a la cola de ejecución.
+
+        Parámetros:
+            funcion (callable): Función a ejecutar en uno de los hilos
+            *args: Argumentos de la función
+
+        Retorna:
+            concurrent.futures.Future: Resultado de la función
+        """
+        futuro = Future()
+        self.cola.put((futuro, funcion, args))
+        return futuro
+
+    def shutdown(self):
+        """Cancela las funciones en cola y detiene los hilos sin esperar a las que están en curso."""
+        while True:
+            try:
+                tarea = self.cola.get_nowait()
+            except queue.Empty:
+                break
+            if tarea is not None:
+                tarea[0].cancel()
+        for _ in self.hilos:
+            self.cola.put(None)
+
+
+class BucleAsyncTk:
+    """
+    Ejecuta un bucle de asyncio dentro del mainloop de Tkinter.
+
+    Cada pocos milisegundos Tkinter le cede el control al bucle de asyncio, que procesa
+    las tareas listas y vuelve enseguida, por lo que la ventana sigue respondiendo y
+    redibujándose mientras hay descargas en curso. Todas las corrutinas se ejecutan en
+    el mismo hilo que Tkinter, así que pueden actualizar los widgets directamente.
+    """
+
+    def __init__(self, root, intervalo_ms=20, max_workers=5):
+        """
+        Crea el bucle de asyncio y lo engancha al mainloop de la ventana.
+
+        Parámetros:
+            root (tk.Tk): Ventana principal de la aplicación
+            intervalo_ms (int): Cada cuántos milisegundos se procesa el bucle de asyncio
+            max_workers (int): Cantidad de hilos para las solicitudes HTTP
+        """
+        self.root = root
+        self.intervalo_ms = intervalo_ms
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        # Hilos propios para las solicitudes, separados del ejecutor por defecto de asyncio
+        self.executor = EjecutorHilosDemonio(max_workers)
+        self.after_id = self.root.after(self.intervalo_ms, self.procesar)
+
+    def procesar(self):
+        """Procesa los eventos pendientes de asyncio y se reprograma en Tkinter."""
+        # Ejecuta una sola vuelta del bucle: stop() se atiende después de las tareas listas
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        self.after_id = self.root.after(self.intervalo_ms, self.procesar)
+
+    def crear_tarea(self, corrutina):
+        """
+        Programa una corrutina en el bucle de asyncio.
+
+        Parámetros:
+            corrutina (coroutine): Corrutina a ejecutar
+
+        Retorna:
+            asyncio.Task: Tarea creada, que puede cancelarse con cancel()
+        """
+        return self.loop.create_task(corrutina)
+
+    async def descargar(self, url, headers=None, timeout=10):
+        """
+        Descarga una URL sin bloquear el bucle de eventos.
+
+        La solicitud se realiza en uno de los hilos del bucle. El tiempo límite empieza
+        a contar cuando la solicitud comienza a ejecutarse, no mientras espera un hilo
+        libre. Si se cancela la tarea antes de empezar, la solicitud no llega a enviarse;
+        si ya empezó, su resultado se descarta y el hilo se libera al vencer el tiempo
+        límite de requests.
+
+        Parámetros:
+            url (str): URL a descargar
+            headers (dict): Encabezados HTTP de la solicitud
+            timeout (float): Tiempo límite en segundos
+
+        Retorna:
+            requests.Response: Respuesta de la solicitud
+
+        Lanza:
+            asyncio.TimeoutError: Si se supera el tiempo límite
+            requests.exceptions.RequestException: Si falla la conexión o hay un error HTTP
+        """
+        iniciada = asyncio.Event()
+
+        def solicitud():
+            # Avisar al bucle que la solicitud empezó a ejecutarse
+            self.loop.call_soon_threadsafe(iniciada.set)
+            return requests.get(url, headers=headers, timeout=timeout)
+
+        futuro = self.loop.run_in_executor(self.executor, solicitud)
+        try:
+            await iniciada.wait()
+        except asyncio.CancelledError:
+            futuro.cancel()  # Quitar la solicitud de la cola si todavía no empezó
+            raise
+        respuesta = await asyncio.wait_for(futuro, timeout)
+        respuesta.raise_for_status()  # Lanzar excepción si hay error HTTP
+        return respuesta
+
+    def cerrar(self):
+        """Cancela las tareas pendientes y cierra el bucle de asyncio."""
+        self.root.after_cancel(self.after_id)
+        pendientes = asyncio.all_tasks(self.loop)
+        for tarea in pendientes:
+            tarea.cancel()
+        # Dejar que las tareas canceladas terminen antes de cerrar el bucle
+        self.loop.run_until_complete(asyncio.gather(*pendientes, return_exceptions=True))
+        # Descartar las solicitudes en cola; las que están en curso terminan en hilos demonio
+        # que no impiden la salida del programa
+        self.executor.shutdown()
+        self.loop.close()
+
+
+def describir_error(error):
+    """
+    Obtiene una descripción corta de un error de descarga para la barra de estado.
+
+    Parámetros:
+        error (Exception): Error producido al descargar una URL
+
+    Retorna:
+        str: Descripción breve (ej: 'HTTP 404', 'tiempo agotado', 'ConnectionError')
+    """
+    if isinstance(error, (asyncio.TimeoutError, requests.exceptions.Timeout)):
+        return "tiempo agotado"
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return f"HTTP {error.response.status_code}"
+    return type(error).__name__
@@ -1,5 +1,5 @@
 """
-Programa que extrae los títulos de los primeros 5 artículos de un blog mediante interfaz gráfica.
+Programa que extrae los títulos de los primeros 5 artículos de uno o más blogs mediante interfaz gráfica.
 Por: Leandro Marquez
 Para: Programación V - UBA
 """
@@ -13,7 +13,10 @@ from tkinter.font import Font  # Para manejar fuentes de texto
 from PIL import Image, ImageTk  # Para manejar imágenes en la interfaz
 import io  # Para operaciones de entrada/salida
 import re  # Para expresiones regulares (validación de URLs)
+import asyncio  # Para descargar varios blogs a la vez sin bloquear la interfaz
+from bucle_async import BucleAsyncTk, describir_error  # Integración de asyncio con Tkinter
 from urllib.parse import urljoin  # Para construir URLs absolutas a partir de relativas
+from normalizador_urls import normalizar_url, ConjuntoVistos  # Para evitar artículos repetidos
 
 class BlogScraperApp:
     """Clase principal que define la aplicación de extracción de artículos de blog."""
@@ -41,6 +44,18 @@ class BlogScraperApp:
         self.style.configure('Success.TLabel', foreground='#27ae60')
         self.style.configure('Error.TLabel', foreground='#e74c3c')
         
+        # Registro persistente de los artículos ya mostrados en ejecuciones anteriores
+        self.vistos = ConjuntoVistos("articulos_vistos.bin")
+        
+        # Bucle de asyncio integrado con Tkinter para las descargas
+        self.max_concurrent = 5  # Máximo de descargas simultáneas
+        self.bucle = BucleAsyncTk(self.root, max_workers=self.max_concurrent)
+        self.tarea = None  # Extracción en curso
+        self.progreso = {}  # Estado de cada URL de la extracción en curso
+        self.enlaces_agregados = set()  # Enlaces normalizados mostrados en la extracción en curso
+        # Cerrar el bucle de asyncio al cerrar la ventana
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        
         # Crear todos los widgets de la interfaz
         self.create_widgets()
     
@@ -79,7 +94,7 @@ class BlogScraperApp:
         input_frame = ttk.Frame(main_frame)
         input_frame.pack(fill=tk.X, pady=(0, 20))  # Se expande horizontalmente
         
-        # Etiqueta para el campo de URL
+        # Etiqueta para el campo de URL (se admiten varias, separadas por espacios)
         url_label = ttk.Label(input_frame, text="URL del Blog:")
         url_label.pack(side=tk.LEFT, padx=(0, 10))
         
@@ -91,6 +106,22 @@ class BlogScraperApp:
         extract_btn = ttk.Button(input_frame, text="Extraer Títulos", command=self.extract_titles)
         extract_btn.pack(side=tk.LEFT)
         
+        # Botón para cancelar la extracción en curso
+        cancel_btn = ttk.Button(input_frame, text="Cancelar", command=self.cancel_extraction)
+        cancel_btn.pack(side=tk.LEFT, padx=(5, 0))
+        
+        # Selector del tiempo límite por solicitud
+        timeout_label = ttk.Label(input_frame, text="Tiempo límite (s):")
+        timeout_label.pack(side=tk.LEFT, padx=(10, 5))
+        self.timeout_var = tk.IntVar(value=10)  # Valor por defecto: 10 segundos
+        timeout_spin = ttk.Spinbox(input_frame, from_=1, to=60, textvariable=self.timeout_var, width=3)
+        timeout_spin.pack(side=tk.LEFT)
+        
+        # Checkbox para mostrar solo artículos no vistos en ejecuciones anteriores
+        self.new_only_var = tk.BooleanVar()
+        new_only_check = ttk.Checkbutton(input_frame, text="Solo nuevos", variable=self.new_only_var)
+        new_only_check.pack(side=tk.LEFT, padx=(10, 0))
+        
         # ================== ÁREA DE RESULTADOS ==================
         results_frame = ttk.Frame(main_frame)
         results_frame.pack(fill=tk.BOTH, expand=True)  # Se expande en ambas direcciones
@@ -146,114 +177,250 @@ class BlogScraperApp:
         return re.match(regex, url) is not None
     
     def extract_titles(self):
-        """Realiza el proceso de extracción de títulos de artículos de un blog."""
-        # Obtener la URL ingresada por el usuario
-        url = self.url_entry.get().strip()
+        """Valida las URLs ingresadas e inicia la extracción de títulos en segundo plano."""
+        # Obtener las URLs ingresadas por el usuario (separadas por espacios o comas)
+        urls = [u for u in re.split(r'[\s,]+', self.url_entry.get().strip()) if u]
         
         # Validar que se haya ingresado una URL
-        if not url:
+        if not urls:
             messagebox.showerror("Error", "Por favor ingrese una URL del blog")
             return
         
-        # Validar el formato de la URL
-        if not self.validate_url(url):
-            messagebox.showerror("Error", "La URL ingresada no es válida. Debe comenzar con http:// o https://")
+        # Validar el formato de cada URL
+        for url in urls:
+            if not self.validate_url(url):
+                messagebox.showerror("Error", f"La URL ingresada no es válida: {url}\nDebe comenzar con http:// o https://")
+                return
+        
+        # Validar el tiempo límite antes de iniciar
+        try:
+            timeout = self.timeout_var.get()
+        except tk.TclError:
+            timeout = 0
+        if timeout < 1:
+            messagebox.showerror("Error", "El tiempo límite debe ser un número entero mayor que 0")
             return
         
-        # Actualizar estado de la aplicación
-        self.status_var.set("Extrayendo títulos...")
-        self.root.update()  # Actualizar la interfaz inmediatamente
+        # Quitar URLs repetidas (misma URL normalizada)
+        urls_unicas = {}
+        for url in urls:
+            urls_unicas.setdefault(normalizar_url(url), url)
+        urls = list(urls_unicas.values())
+        
+        # Cancelar la extracción anterior si todavía está en curso
+        self.cancel_extraction()
+        
+        # Limpiar el área de resultados y crear una sección por cada URL
+        self.results_text.delete(1.0, tk.END)
+        self.progreso = {}
+        for i, url in enumerate(urls):
+            self.results_text.insert(tk.END, f"=== Títulos encontrados en: {url} ===\n", 'header')
+            self.results_text.insert(tk.END, "   Pendiente...\n", ('estado', f'estado_{i}'))
+            self.results_text.insert(tk.END, "\n")
+            # Marca donde se insertarán los títulos de esta URL (antes de la línea en blanco)
+            self.results_text.mark_set(f'fin_{i}', tk.END + '-2c')
+            self.results_text.mark_gravity(f'fin_{i}', tk.RIGHT)
+            self.progreso[url] = "pendiente"
+        
+        # Iniciar la extracción en el bucle de asyncio
+        self.tarea = self.bucle.crear_tarea(self.run_extraction(urls, timeout))
+    
+    def cancel_extraction(self):
+        """Cancela la extracción en curso, si la hay."""
+        if self.tarea and not self.tarea.done():
+            self.tarea.cancel()
+            # Marcar como canceladas las URLs que no terminaron
+            for url, estado in self.progreso.items():
+                if not estado.startswith('Éxito') and estado != 'error':
+                    self.set_url_status(url, "Cancelado", 'error')
+            self.status_var.set("Extracción cancelada")
+    
+    def set_url_status(self, url, estado, tag='estado'):
+        """
+        Actualiza el estado de una URL en el área de resultados y en la barra de estado.
+        
+        Parámetros:
+            url (str): URL cuyo estado cambió
+            estado (str): Descripción del nuevo estado
+            tag (str): Estilo de texto a aplicar ('estado' o 'error')
+        """
+        # Reemplazar la línea de estado de la sección correspondiente a la URL
+        i = list(self.progreso).index(url)
+        inicio, fin = self.results_text.tag_ranges(f'estado_{i}')
+        self.results_text.delete(inicio, fin)
+        self.results_text.insert(inicio, f"   {estado}\n", (tag, f'estado_{i}'))
+        
+        # Resumen del progreso de todas las URLs en la barra de estado
+        self.progreso[url] = tag if tag == 'error' else estado
+        total = len(self.progreso)
+        en_curso = sum(1 for e in self.progreso.values() if e.startswith(('Descargando', 'Analizando')))
+        errores = sum(1 for e in self.progreso.values() if e == 'error')
+        terminadas = sum(1 for e in self.progreso.values() if e.startswith('Éxito')) + errores
+        self.status_var.set(f"{terminadas}/{total} terminadas, {en_curso} en curso, "
+                            f"{errores} con error | {url}: {estado}")
+    
+    async def run_extraction(self, urls, timeout):
+        """
+        Extrae los títulos de todas las URLs de forma concurrente.
         
+        Parámetros:
+            urls (list): URLs de los blogs a analizar
+            timeout (int): Tiempo límite por solicitud, en segundos
+        """
         try:
-            # Configurar encabezados HTTP para simular un navegador real
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept-Language': 'es-ES,es;q=0.9'  # Preferencia de idioma
-            }
+            # Limitar la cantidad de descargas simultáneas
+            limite = asyncio.Semaphore(self.max_concurrent)
+            # Enlaces normalizados ya mostrados en esta ejecución (compartido entre blogs)
+            self.enlaces_agregados = set()
             
-            # Realizar la solicitud HTTP al blog
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()  # Lanzar excepción si hay error HTTP
+            resultados = await asyncio.gather(*(self.extract_from_blog(url, limite, timeout) for url in urls))
             
-            # Parsear el contenido HTML de la respuesta
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Registrar los artículos mostrados para las próximas ejecuciones
+            self.vistos.guardar()
             
-            # Lista para almacenar los títulos encontrados
-            titulos = []
+            # Actualizar estado con el número de títulos encontrados
+            self.status_var.set(f"Extracción completada: {sum(resultados)} títulos en {len(urls)} blogs")
+        # Manejo de cualquier error inesperado durante la extracción
+        except Exception as e:
+            self.status_var.set(f"Error en la extracción: {e}")
+    
+    async def extract_from_blog(self, url, limite, timeout):
+        """
+        Descarga un blog y muestra los títulos de sus primeros 5 artículos.
+        
+        Parámetros:
+            url (str): URL del blog
+            limite (asyncio.Semaphore): Límite de descargas simultáneas
+            timeout (int): Tiempo límite de la solicitud, en segundos
             
-            # Lista de selectores CSS comunes para encontrar títulos de artículos
-            selectores = [
-                'h2 a',                # Selector genérico para títulos
-                'h1 a',                 # Para blogs que usan h1 en artículos
-                'article h2 a',         # Típico en WordPress y otros CMS
-                '.post-title a',        # Clase común para títulos de posts
-                '.entry-title a',       # Otra clase común en blogs
-                '[itemprop="headline"] a', # Para sitios que usan schema.org
-                'h3 a'                  # Algunos blogs usan h3 para títulos
-            ]
+        Retorna:
+            int: Cantidad de títulos mostrados
+        """
+        # Configurar encabezados HTTP para simular un navegador real
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept-Language': 'es-ES,es;q=0.9'  # Preferencia de idioma
+        }
+        
+        try:
+            async with limite:
+                # Realizar la solicitud HTTP al blog sin bloquear la interfaz
+                self.set_url_status(url, "Descargando...")
+                response = await self.bucle.descargar(url, headers=headers, timeout=timeout)
             
-            # Probar cada selector hasta obtener 5 títulos
-            for selector in selectores:
-                # Salir del bucle si ya tenemos 5 títulos
-                if len(titulos) >= 5:
-                    break
-                
-                # Buscar elementos que coincidan con el selector actual
-                elementos = soup.select(selector)
-                
-                # Procesar cada elemento encontrado
-                for elemento in elementos:
-                    # Salir si ya tenemos 5 títulos
-                    if len(titulos) >= 5:
-                        break
-                    
-                    # Obtener el texto del título y eliminar espacios en blanco
-                    texto = elemento.get_text().strip()
-                    
-                    # Solo agregar si el título tiene texto
-                    if texto:
-                        # Obtener el enlace del artículo
-                        enlace = elemento.get('href', '#')
-                        
-                        # Convertir enlace relativo a absoluto si es necesario
-                        if not enlace.startswith(('http://', 'https://')):
-                            enlace = urljoin(url, enlace)
-                        
-                        # Agregar título y enlace a la lista
-                        titulos.append((texto, enlace))
+            self.set_url_status(url, "Analizando...")
+            titulos = self.find_titles(response.text, url)
             
             # Comprobar si se encontraron títulos
             if not titulos:
-                messagebox.showwarning("Advertencia", "No se encontraron artículos en la página")
-                self.status_var.set("Listo")
-                return
-            
-            # Limpiar el área de resultados
-            self.results_text.delete(1.0, tk.END)
+                mensaje = "No hay artículos nuevos en la página" if self.new_only_var.get() else "No se encontraron artículos en la página"
+                self.set_url_status(url, mensaje, 'error')
+                return 0
             
-            # Mostrar encabezado con la URL analizada
-            self.results_text.insert(tk.END, f"=== Títulos encontrados en: {url} ===\n\n", 'header')
-            
-            # Mostrar cada título encontrado (hasta 5)
-            for i, (titulo, enlace) in enumerate(titulos[:5], 1):
+            # Mostrar cada título encontrado en la sección de la URL
+            marca = f'fin_{list(self.progreso).index(url)}'
+            for i, (titulo, enlace) in enumerate(titulos, 1):
                 # Número de artículo
-                self.results_text.insert(tk.END, f"{i}. ", 'number')
+                self.results_text.insert(marca, f"{i}. ", 'number')
                 # Título del artículo
-                self.results_text.insert(tk.END, f"{titulo}\n", 'title')
+                self.results_text.insert(marca, f"{titulo}\n", 'title')
                 # Enlace al artículo
-                self.results_text.insert(tk.END, f"   Enlace: {enlace}\n\n", 'link')
+                self.results_text.insert(marca, f"   Enlace: {enlace}\n\n", 'link')
+                self.vistos.agregar(enlace)
             
-            # Actualizar estado con el número de títulos encontrados
-            self.status_var.set(f"Éxito: {len(titulos[:5])} títulos encontrados")
+            self.set_url_status(url, f"Éxito: {len(titulos)} títulos encontrados")
+            return len(titulos)
             
+        # Tiempo límite agotado
+        except asyncio.TimeoutError:
+            self.set_url_status(url, f"Tiempo agotado ({timeout} s)", 'error')
         # Manejo de errores específicos de conexión
         except requests.exceptions.RequestException as e:
-            messagebox.showerror("Error de Conexión", f"No se pudo acceder al blog:\n{str(e)}")
-            self.status_var.set("Error de conexión")
+            self.set_url_status(url, f"Error de conexión: {describir_error(e)}", 'error')
         # Manejo de cualquier otro error inesperado
         except Exception as e:
-            messagebox.showerror("Error", f"Ocurrió un error inesperado:\n{str(e)}")
-            self.status_var.set("Error")
+            self.set_url_status(url, f"Error inesperado: {e}", 'error')
+        return 0
+    
+    def find_titles(self, html, url):
+        """
+        Busca los títulos y enlaces de los primeros 5 artículos de una página.
+        
+        Parámetros:
+            html (str): Contenido HTML de la página
+            url (str): URL de la página, para construir enlaces absolutos
+            
+        Retorna:
+            list: Tuplas (título, enlace) de hasta 5 artículos no repetidos
+        """
+        # Parsear el contenido HTML de la respuesta
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # Lista para almacenar los títulos encontrados
+        titulos = []
+        # Omitir artículos mostrados en ejecuciones anteriores si está seleccionada la opción
+        solo_nuevos = self.new_only_var.get()
+        
+        # Lista de selectores CSS comunes para encontrar títulos de artículos
+        selectores = [
+            'h2 a',                # Selector genérico para títulos
+            'h1 a',                 # Para blogs que usan h1 en artículos
+            'article h2 a',         # Típico en WordPress y otros CMS
+            '.post-title a',        # Clase común para títulos de posts
+            '.entry-title a',       # Otra clase común en blogs
+            '[itemprop="headline"] a', # Para sitios que usan schema.org
+            'h3 a'                  # Algunos blogs usan h3 para títulos
+        ]
+        
+        # Probar cada selector hasta obtener 5 títulos
+        for selector in selectores:
+            # Salir del bucle si ya tenemos 5 títulos
+            if len(titulos) >= 5:
+                break
+            
+            # Buscar elementos que coincidan con el selector actual
+            elementos = soup.select(selector)
+            
+            # Procesar cada elemento encontrado
+            for elemento in elementos:
+                # Salir si ya tenemos 5 títulos
+                if len(titulos) >= 5:
+                    break
+                
+                # Obtener el texto del título y eliminar espacios en blanco
+                texto = elemento.get_text().strip()
+                
+                # Solo agregar si el título tiene texto
+                if texto:
+                    # Obtener el enlace del artículo (se omiten los títulos sin enlace)
+                    enlace = elemento.get('href', '').strip()
+                    if not enlace:
+                        continue
+                    
+                    # Convertir enlace relativo a absoluto (se omiten los enlaces mal formados)
+                    try:
+                        enlace = urljoin(url, enlace)
+                    except ValueError:
+                        continue
+                    
+                    # Omitir artículos repetidos en esta ejecución (misma URL normalizada)
+                    clave = normalizar_url(enlace)
+                    if clave in self.enlaces_agregados:
+                        continue
+                    # Omitir artículos ya mostrados en ejecuciones anteriores
+                    if solo_nuevos and clave in self.vistos:
+                        continue
+                    self.enlaces_agregados.add(clave)
+                    
+                    # Agregar título y enlace a la lista
+                    titulos.append((texto, enlace))
+        
+        return titulos
+    
+    def close(self):
+        """Cancela las descargas pendientes y cierra la aplicación."""
+        self.bucle.cerrar()
+        self.root.destroy()
 
 # Punto de entrada principal del programa
 if __name__ == "__main__":
@@ -269,7 +436,11 @@ if __name__ == "__main__":
         # Estilo para títulos de artículos
         'title': {'foreground': '#2980b9', 'font': ('Helvetica', 10)},
         # Estilo para enlaces
-        'link': {'foreground': '#7f8c8d', 'font': ('Helvetica', 9)}
+        'link': {'foreground': '#7f8c8d', 'font': ('Helvetica', 9)},
+        # Estilo para el estado de cada URL
+        'estado': {'foreground': '#27ae60', 'font': ('Helvetica', 9, 'italic')},
+        # Estilo para errores de cada URL
+        'error': {'foreground': '#e74c3c', 'font': ('Helvetica', 9, 'italic')}
     }
     
     # Crear la instancia de la aplicación
@@ -15,7 +15,12 @@ from PIL import Image, ImageTk  # Para manejar imágenes en la interfaz
 import csv  # Para trabajar con archivos CSV
 import io  # Para operaciones de entrada/salida
 import os  # Para operaciones del sistema de archivos
+import asyncio  # Para descargar varias páginas a la vez sin bloquear la interfaz
+from bucle_async import BucleAsyncTk, describir_error  # Integración de asyncio con Tkinter
 from urllib.parse import urljoin  # Para construir URLs absolutas a partir de relativas
+from normalizador_urls import normalizar_url  # Para no repetir libros
+from historial_precios import (HistorialPrecios, MonitorPrecios,  # Historial y alertas de precios
+                               ReglaAlerta, DestinoArchivo)
 
 class BookScraperApp:
     """Clase principal que define la aplicación de extracción de datos de libros."""
@@ -33,8 +38,20 @@ class BookScraperApp:
         self.setup_styles()
         # Creación de los componentes de la interfaz
         self.create_widgets()
-        # Configuración inicial de la conexión a base de datos (simulada)
+        # Configuración inicial de la conexión a la base de datos del historial
         self.setup_db_connection()
+        
+        # Bucle de asyncio integrado con Tkinter para las descargas
+        self.max_concurrent = 5  # Máximo de descargas simultáneas
+        self.bucle = BucleAsyncTk(self.root, max_workers=self.max_concurrent)
+        self.tarea = None  # Scraping en curso
+        self.progreso = {}  # Estado de cada página del scraping en curso
+        self.books = []  # Libros recibidos en el scraping en curso
+        self.libros_vistos = set()  # Enlaces normalizados de los libros recibidos
+        self.paginas_recibidas = {}  # Libros de cada página descargada, pendientes de mostrar
+        self.paginas_pendientes = []  # Páginas por mostrar, en orden
+        # Cerrar el bucle de asyncio al cerrar la ventana
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
     
     def setup_styles(self):
         """Configura los estilos visuales para los componentes de la interfaz."""
@@ -68,8 +85,20 @@ class BookScraperApp:
                       background=[('active', self.secondary_color), ('!active', self.primary_color)])
     
     def setup_db_connection(self):
-        """Configura la conexión a la base de datos (simulada en esta implementación)."""
-        self.db_connected = False  # En una implementación real, aquí se establecería la conexión
+        """Configura la conexión a la base de datos del historial de precios y las alertas."""
+        try:
+            # Historial de capturas de precio y rating entre ejecuciones
+            self.historial = HistorialPrecios("historial_libros.db")
+            # Reglas de alerta: cambios de precio mayores al 5% desde la ejecución anterior
+            self.monitor = MonitorPrecios(
+                self.historial,
+                reglas=[ReglaAlerta("Variación de precio", variacion_porcentaje=5.0)],
+                destinos=[DestinoArchivo("alertas_precios.jsonl")])
+            self.db_connected = True
+        except Exception as e:
+            # Si no se puede abrir la base de datos, la aplicación sigue funcionando sin historial
+            print(f"Error abriendo el historial: {e}")
+            self.db_connected = False
     
     def create_widgets(self):
         """Crea y organiza todos los componentes de la interfaz gráfica."""
@@ -140,6 +169,11 @@ class BookScraperApp:
                               command=self.start_scraping, width=15)
         scrape_btn.pack(side=tk.LEFT, padx=5)
         
+        # Botón para cancelar el scraping en curso
+        cancel_btn = ttk.Button(btn_frame, text="Cancelar", 
+                              command=self.cancel_scraping, width=15)
+        cancel_btn.pack(side=tk.LEFT, padx=5)
+        
         # Botón para exportar a CSV
         export_btn = ttk.Button(btn_frame, text="Exportar CSV", 
                               command=self.export_to_csv, width=15)
@@ -164,7 +198,15 @@ class BookScraperApp:
                                 textvariable=self.pages_var, width=3)
         pages_spin.pack(side=tk.LEFT)
         
-        # Checkbox para simular guardado en base de datos
+        # Selector del tiempo límite por solicitud
+        timeout_label = ttk.Label(options_frame, text="Tiempo límite (s):")
+        timeout_label.pack(side=tk.LEFT, padx=(15, 5))
+        self.timeout_var = tk.IntVar(value=10)  # Valor por defecto: 10 segundos
+        timeout_spin = ttk.Spinbox(options_frame, from_=1, to=60, 
+                                  textvariable=self.timeout_var, width=3)
+        timeout_spin.pack(side=tk.LEFT)
+        
+        # Checkbox para guardar la ejecución en el historial de precios
         self.db_var = tk.BooleanVar()  # Variable para estado del checkbox
         db_check = ttk.Checkbutton(options_frame, text="Guardar en BD", 
                                   variable=self.db_var)
@@ -291,84 +333,182 @@ class BookScraperApp:
                               book_data['link']))
     
     def start_scraping(self):
-        """Inicia el proceso de scraping de libros."""
+        """Valida las opciones e inicia el proceso de scraping de libros en segundo plano."""
+        # Obtener número de páginas a scrapear y tiempo límite por solicitud
+        try:
+            pages_to_scrape = self.pages_var.get()
+            timeout = self.timeout_var.get()
+        except tk.TclError:
+            messagebox.showerror("Error", "Las páginas y el tiempo límite deben ser números enteros")
+            return
+        
+        # Validar que los valores sean positivos
+        if pages_to_scrape < 1 or timeout < 1:
+            messagebox.showerror("Error", "Las páginas y el tiempo límite deben ser mayores que 0")
+            return
+        
+        # Cancelar el scraping anterior si todavía está en curso
+        self.cancel_scraping()
         # Limpiar resultados anteriores
         self.clear_results()
         # Actualizar estado
         self.status_var.set("Iniciando scraping...")
-        self.root.update()  # Forzar actualización de la interfaz
+        # Iniciar el scraping en el bucle de asyncio
+        self.tarea = self.bucle.crear_tarea(self.run_scraping(pages_to_scrape, timeout))
+    
+    def cancel_scraping(self):
+        """Cancela el scraping en curso, si lo hay."""
+        if self.tarea and not self.tarea.done():
+            self.tarea.cancel()
+            # Marcar como canceladas las páginas que no terminaron
+            for page, estado in self.progreso.items():
+                if estado in ("pendiente", "descargando"):
+                    self.progreso[page] = "cancelada"
+            self.update_progress()
+            self.status_var.set(f"Scraping cancelado. {len(self.books)} libros encontrados. "
+                                + self.status_var.get())
+    
+    def update_progress(self):
+        """Muestra en la barra de estado el progreso de cada página."""
+        detalle = " | ".join(f"Pág. {page}: {estado}" for page, estado in self.progreso.items())
+        self.status_var.set(detalle)
+        # Actualizar contador de resultados con los libros recibidos hasta ahora
+        self.results_count.config(text=f"Libros encontrados: {len(self.books)}")
+    
+    async def run_scraping(self, pages_to_scrape, timeout):
+        """
+        Descarga de forma concurrente todas las páginas seleccionadas.
         
+        Parámetros:
+            pages_to_scrape (int): Cantidad de páginas a scrapear
+            timeout (int): Tiempo límite por solicitud, en segundos
+        """
         try:
             # URLs base para el scraping
             base_url = "https://books.toscrape.com/"
             catalogue_url = "https://books.toscrape.com/catalogue/"
             
-            # Obtener número de páginas a scrapear
-            pages_to_scrape = self.pages_var.get()
-            
             # Lista para almacenar los libros encontrados
-            books = []
+            self.books = []
+            # Libros ya procesados en esta ejecución
+            self.libros_vistos = set()
             
-            # Recorrer cada página
+            # Construir la URL de cada página
+            pages = {}
             for page in range(1, pages_to_scrape + 1):
-                # Construir URL de la página actual
                 if page == 1:
                     url = base_url  # La primera página tiene una URL diferente
                 else:
                     url = f"{catalogue_url}page-{page}.html"
-                    
-                # Actualizar estado con progreso actual
-                self.status_var.set(f"Scrapeando página {page} de {pages_to_scrape}...")
-                self.root.update()  # Forzar actualización de la interfaz
-                
-                try:
-                    # Realizar solicitud HTTP a la página
-                    response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
-                    response.raise_for_status()  # Verificar si hubo error HTTP
-                    
-                    # Parsear el contenido HTML
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    # Encontrar todos los elementos de libros en la página
-                    book_elements = soup.select('article.product_pod')
-                    
-                    # Procesar cada libro encontrado
-                    for book in book_elements:
-                        # Extraer datos del libro
-                        book_data = self.extract_book_data(book, catalogue_url)
-                        # Añadir a la lista general
-                        books.append(book_data)
-                        # Añadir a la tabla de resultados
-                        self.add_book_to_tree(book_data, len(books))
-                        
-                # Manejar errores de conexión específicos
-                except requests.exceptions.RequestException as e:
-                    messagebox.showwarning("Advertencia", 
-                                        f"No se pudo acceder a la página {page}: {str(e)}")
-                    continue  # Continuar con la siguiente página
+                pages[page] = url
+            
+            self.progreso = {page: "pendiente" for page in pages}
+            # Los libros se muestran en orden de página aunque las descargas terminen en otro orden
+            self.paginas_recibidas = {}
+            self.paginas_pendientes = list(pages)
+            self.update_progress()
+            
+            # Limitar la cantidad de descargas simultáneas
+            limite = asyncio.Semaphore(self.max_concurrent)
+            await asyncio.gather(*(self.scrape_page(page, url, limite, timeout)
+                                   for page, url in pages.items()))
             
             # Actualizar estado al finalizar
-            self.status_var.set(f"Scraping completado. {len(books)} libros encontrados.")
-            # Actualizar contador de resultados
-            self.results_count.config(text=f"Libros encontrados: {len(books)}")
+            errores = sum(1 for estado in self.progreso.values() if estado.startswith("error"))
+            self.update_progress()
+            self.status_var.set(f"Scraping completado. {len(self.books)} libros encontrados"
+                                f"{f' ({errores} páginas con error)' if errores else ''}. "
+                                + self.status_var.get())
             
-            # Simular guardado en base de datos si está seleccionada la opción
+            # Guardar en el historial de precios si está seleccionada la opción
             if self.db_var.get():
-                self.save_to_database(books)
+                self.save_to_database(self.books)
             
         # Manejar errores generales durante el scraping
         except Exception as e:
-            messagebox.showerror("Error", f"Error durante el scraping: {str(e)}")
-            self.status_var.set("Error en el scraping")
+            self.status_var.set(f"Error en el scraping: {e}")
+    
+    async def scrape_page(self, page, url, limite, timeout):
+        """
+        Descarga una página del catálogo y guarda sus libros para mostrarlos en orden.
+        
+        Parámetros:
+            page (int): Número de la página
+            url (str): URL de la página
+            limite (asyncio.Semaphore): Límite de descargas simultáneas
+            timeout (int): Tiempo límite de la solicitud, en segundos
+        """
+        try:
+            async with limite:
+                # Realizar solicitud HTTP a la página sin bloquear la interfaz
+                self.progreso[page] = "descargando"
+                self.update_progress()
+                response = await self.bucle.descargar(url, headers={'User-Agent': 'Mozilla/5.0'},
+                                                      timeout=timeout)
+            
+            # Parsear el contenido HTML
+            soup = BeautifulSoup(response.text, 'html.parser')
+            # Encontrar todos los elementos de libros en la página
+            book_elements = soup.select('article.product_pod')
+            
+            # Procesar cada libro encontrado
+            libros_pagina = []
+            for book in book_elements:
+                # Extraer datos del libro (los enlaces son relativos a la página descargada)
+                try:
+                    libros_pagina.append(self.extract_book_data(book, response.url))
+                except ValueError:
+                    continue  # Enlace mal formado: se omite solo este libro
+            
+            self.paginas_recibidas[page] = libros_pagina
+            self.progreso[page] = f"{len(book_elements)} libros"
+            
+        # Tiempo límite agotado
+        except asyncio.TimeoutError:
+            self.paginas_recibidas[page] = []
+            self.progreso[page] = f"error (tiempo agotado, {timeout} s)"
+        # Manejar errores de conexión y cualquier otro error durante el procesamiento de la página
+        except Exception as e:
+            self.paginas_recibidas[page] = []
+            self.progreso[page] = f"error ({describir_error(e)})"
+        
+        self.show_received_pages()
+        self.update_progress()
+    
+    def show_received_pages(self):
+        """Añade a la tabla los libros de las páginas recibidas que ya pueden mostrarse en orden."""
+        # Mostrar páginas mientras la siguiente en orden ya haya terminado
+        while self.paginas_pendientes and self.paginas_pendientes[0] in self.paginas_recibidas:
+            page = self.paginas_pendientes.pop(0)
+            for book_data in self.paginas_recibidas.pop(page):
+                # Omitir libros repetidos (misma URL normalizada)
+                clave = normalizar_url(book_data['link'])
+                if clave in self.libros_vistos:
+                    continue
+                self.libros_vistos.add(clave)
+                # Añadir a la lista general
+                self.books.append(book_data)
+                # Añadir a la tabla de resultados
+                self.add_book_to_tree(book_data, len(self.books))
     
     def save_to_database(self, books):
         """
-        Simula el guardado de datos en una base de datos.
+        Guarda los libros en el historial de precios y genera las alertas de la ejecución.
         
         Parámetros:
             books (list): Lista de libros a guardar
         """
-        # En una implementación real, aquí se conectaría a la BD y guardaría los datos
-        self.status_var.set(f"Datos guardados en la base de datos ({len(books)} registros)")
+        # Verificar que la base de datos esté disponible
+        if not self.db_connected:
+            self.status_var.set("Historial no disponible: no se guardaron los datos")
+            return
+        
+        # Registrar la captura y evaluar las reglas sobre los cambios respecto a la anterior
+        self.historial.registrar_ejecucion(books)
+        alertas = self.monitor.procesar()
+        
+        self.status_var.set(f"Datos guardados en la base de datos ({len(books)} registros, "
+                            f"{len(alertas)} alertas de precio)")
     
     def export_to_csv(self):
         """Exporta los datos de la tabla a un archivo CSV."""
@@ -422,6 +562,14 @@ class BookScraperApp:
         self.results_count.config(text="Libros encontrados: 0")
         # Actualizar barra de estado
         self.status_var.set("Resultados limpiados")
+    
+    def close(self):
+        """Cancela las descargas pendientes y cierra la aplicación."""
+        self.bucle.cerrar()
+        # Cerrar la conexión con el historial de precios
+        if self.db_connected:
+            self.historial.cerrar()
+        self.root.destroy()
 
 # Punto de entrada principal del programa
 if __name__ == "__main__":
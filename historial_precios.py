@@ -0,0 +1,365 @@
+"""
+Módulo que guarda un historial de precios y ratings de libros entre ejecuciones
+y genera alertas cuando un precio cambia más de lo permitido.
+Por: Leandro Marquez
+Para: Programación V - UBA
+"""
+
+# Importación de bibliotecas necesarias
+import sqlite3  # Para la base de datos local del historial
+import json  # Para serializar las alertas
+from datetime import datetime  # Para las marcas de tiempo de cada captura
+
+
+class HistorialPrecios:
+    """
+    Almacén de capturas de precio y rating por libro, indexado por enlace y ejecución.
+
+    Además de las capturas, mantiene una tabla de resumen por libro que se actualiza
+    de forma incremental en cada ejecución (último precio, precio anterior, mínimo,
+    máximo y promedio), de modo que las consultas no necesitan recorrer todo el historial.
+    """
+
+    def __init__(self, ruta_db="historial_libros.db"):
+        """
+        Abre (o crea) la base de datos del historial.
+
+        Parámetros:
+            ruta_db (str): Ruta del archivo SQLite (':memory:' para pruebas)
+        """
+        self.conexion = sqlite3.connect(ruta_db)
+        self.conexion.row_factory = sqlite3.Row  # Filas accesibles por nombre de columna
+        self.crear_tablas()
+
+    def crear_tablas(self):
+        """Crea las tablas e índices del historial si todavía no existen."""
+        self.conexion.executescript("""
+            CREATE TABLE IF NOT EXISTS ejecuciones (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                marca_tiempo TEXT NOT NULL
+            );
+
+            -- Una fila por libro y por ejecución
+            CREATE TABLE IF NOT EXISTS capturas (
+                enlace TEXT NOT NULL,
+                marca_tiempo TEXT NOT NULL,
+                id_ejecucion INTEGER NOT NULL REFERENCES ejecuciones(id),
+                titulo TEXT,
+                precio REAL,
+                rating INTEGER,
+                PRIMARY KEY (enlace, id_ejecucion)
+            );
+
+            -- Estado acumulado por libro, actualizado en cada ejecución
+            CREATE TABLE IF NOT EXISTS resumen (
+                enlace TEXT PRIMARY KEY,
+                titulo TEXT,
+                precio_anterior REAL,
+                precio_actual REAL,
+                rating_anterior INTEGER,
+                rating_actual INTEGER,
+                precio_min REAL,
+                precio_max REAL,
+                suma_precios REAL,
+                num_capturas INTEGER,
+                ultima_ejecucion INTEGER
+            );
+
+            -- Permite obtener rápidamente los libros vistos en una ejecución
+            CREATE INDEX IF NOT EXISTS idx_resumen_ejecucion ON resumen (ultima_ejecucion);
+        """)
+        self.conexion.commit()
+
+    def convertir_precio(self, precio_texto):
+        """
+        Convierte un precio en texto (ej: '£51.77') a número.
+
+        Parámetros:
+            precio_texto (str | float): Precio tal como se extrajo de la página
+
+        Retorna:
+            float | None: Precio numérico, o None si no se puede interpretar
+        """
+        try:
+            return float(str(precio_texto).replace('£', '').strip())
+        except ValueError:
+            return None
+
+    def registrar_ejecucion(self, libros, marca_tiempo=None):
+        """
+        Guarda una captura de todos los libros y actualiza el resumen por libro.
+
+        Parámetros:
+            libros (list): Lista de diccionarios con 'title', 'price', 'rating' y 'link'
+            marca_tiempo (str): Fecha ISO de la ejecución (por defecto, la actual)
+
+        Retorna:
+            int: Identificador de la ejecución registrada
+        """
+        marca_tiempo = marca_tiempo or datetime.now().isoformat(timespec='microseconds')
+
+        # Toda la ejecución se guarda en una única transacción
+        with self.conexion:
+            cursor = self.conexion.execute(
+                "INSERT INTO ejecuciones (marca_tiempo) VALUES (?)", (marca_tiempo,))
+            id_ejecucion = cursor.lastrowid
+
+            # Un mismo libro puede aparecer más de una vez en la ejecución: se conserva
+            # una sola captura por enlace para no contarlo dos veces en el resumen
+            libros_unicos = {libro['link']: libro for libro in libros}
+
+            for libro in libros_unicos.values():
+                precio = self.convertir_precio(libro['price'])
+                if precio is None:
+                    continue  # Sin precio válido no se puede seguir el libro
+
+                self.conexion.execute(
+                    "INSERT INTO capturas "
+                    "(enlace, marca_tiempo, id_ejecucion, titulo, precio, rating) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (libro['link'], marca_tiempo, id_ejecucion,
+                     libro['title'], precio, libro['rating']))
+
+                # Actualización incremental del resumen: el precio actual pasa a ser
+                # el anterior y se recalculan mínimo, máximo y suma con el nuevo valor
+                self.conexion.execute("""
+                    INSERT INTO resumen (enlace, titulo, precio_anterior, precio_actual,
+                                         rating_anterior, rating_actual, precio_min, precio_max,
+                                         suma_precios, num_capturas, ultima_ejecucion)
+                    VALUES (?, ?, NULL, ?, NULL, ?, ?, ?, ?, 1, ?)
+                    ON CONFLICT (enlace) DO UPDATE SET
+                        titulo = excluded.titulo,
+                        precio_anterior = resumen.precio_actual,
+                        precio_actual = excluded.precio_actual,
+                        rating_anterior = resumen.rating_actual,
+                        rating_actual = excluded.rating_actual,
+                        precio_min = MIN(resumen.precio_min, excluded.precio_actual),
+                        precio_max = MAX(resumen.precio_max, excluded.precio_actual),
+                        suma_precios = resumen.suma_precios + excluded.precio_actual,
+                        num_capturas = resumen.num_capturas + 1,
+                        ultima_ejecucion = excluded.ultima_ejecucion
+                """, (libro['link'], libro['title'], precio, libro['rating'],
+                      precio, precio, precio, id_ejecucion))
+
+        return id_ejecucion
+
+    def ultima_ejecucion(self):
+        """
+        Obtiene el identificador de la ejecución más reciente.
+
+        Retorna:
+            int | None: Identificador de la última ejecución, o None si no hay ninguna
+        """
+        fila = self.conexion.execute("SELECT MAX(id) FROM ejecuciones").fetchone()
+        return fila[0]
+
+    def libros_con_variacion(self, porcentaje):
+        """
+        Busca los libros de la última ejecución cuyo precio cambió más de un porcentaje
+        respecto de su captura anterior.
+
+        Parámetros:
+            porcentaje (float): Variación mínima (en valor absoluto, inclusive) a reportar
+
+        Retorna:
+            list: Diccionarios con enlace, título, precios y variación porcentual
+        """
+        id_ejecucion = self.ultima_ejecucion()
+
+        # Solo se consultan los libros vistos en la última ejecución (usa el índice del resumen)
+        filas = self.conexion.execute("""
+            SELECT enlace, titulo, precio_anterior, precio_actual,
+                   rating_anterior, rating_actual,
+                   (precio_actual - precio_anterior) * 100.0 / precio_anterior AS variacion
+            FROM resumen
+            WHERE ultima_ejecucion = ?
+              AND precio_anterior IS NOT NULL AND precio_anterior > 0
+              AND precio_actual != precio_anterior
+              AND ABS(precio_actual - precio_anterior) * 100.0 / precio_anterior >= ?
+            ORDER BY ABS(variacion) DESC
+        """, (id_ejecucion, porcentaje)).fetchall()
+        return [dict(fila) for fila in filas]
+
+    def estadisticas(self, enlace):
+        """
+        Obtiene el mínimo, máximo y promedio de precio acumulados de un libro.
+
+        Parámetros:
+            enlace (str): Enlace del libro
+
+        Retorna:
+            dict | None: Estadísticas del libro, o None si no tiene capturas
+        """
+        fila = self.conexion.execute("""
+            SELECT enlace, titulo, precio_actual, precio_min, precio_max,
+                   suma_precios / num_capturas AS precio_promedio, num_capturas
+            FROM resumen WHERE enlace = ?
+        """, (enlace,)).fetchone()
+        return dict(fila) if fila else None
+
+    def estadisticas_ventana(self, enlace, capturas=5):
+        """
+        Calcula mínimo, máximo y promedio de las últimas capturas de un libro.
+
+        Parámetros:
+            enlace (str): Enlace del libro
+            capturas (int): Cantidad de capturas recientes a considerar
+
+        Retorna:
+            dict | None: Estadísticas de la ventana, o None si no hay capturas
+        """
+        # La clave (enlace, id_ejecucion) permite leer solo las últimas filas del libro
+        fila = self.conexion.execute("""
+            SELECT MIN(precio) AS precio_min, MAX(precio) AS precio_max,
+                   AVG(precio) AS precio_promedio, COUNT(*) AS num_capturas
+            FROM (SELECT precio FROM capturas WHERE enlace = ?
+                  ORDER BY id_ejecucion DESC LIMIT ?)
+        """, (enlace, capturas)).fetchone()
+        return dict(fila) if fila['num_capturas'] else None
+
+    def historial(self, enlace):
+        """
+        Obtiene todas las capturas de un libro en orden cronológico.
+
+        Parámetros:
+            enlace (str): Enlace del libro
+
+        Retorna:
+            list: Diccionarios con fecha, precio y rating de cada captura
+        """
+        filas = self.conexion.execute(
+            "SELECT marca_tiempo, precio, rating FROM capturas "
+            "WHERE enlace = ? ORDER BY id_ejecucion", (enlace,)).fetchall()
+        return [dict(fila) for fila in filas]
+
+    def cerrar(self):
+        """Cierra la conexión con la base de datos."""
+        self.conexion.close()
+
+
+class ReglaAlerta:
+    """Regla de umbral que decide si un cambio de precio debe generar una alerta."""
+
+    def __init__(self, nombre, variacion_porcentaje=None, precio_maximo=None, direccion='ambas'):
+        """
+        Define una regla de alerta.
+
+        Parámetros:
+            nombre (str): Nombre descriptivo de la regla
+            variacion_porcentaje (float): Variación mínima (en %) para disparar la alerta
+            precio_maximo (float): Dispara la alerta si el precio baja hasta este valor
+            direccion (str): 'sube', 'baja' o 'ambas' (aplica a la variación)
+        """
+        self.nombre = nombre
+        self.variacion_porcentaje = variacion_porcentaje
+        self.precio_maximo = precio_maximo
+        self.direccion = direccion
+
+    def evaluar(self, cambio):
+        """
+        Comprueba si un cambio de precio cumple la regla.
+
+        Parámetros:
+            cambio (dict): Fila devuelta por HistorialPrecios.libros_con_variacion
+
+        Retorna:
+            bool: True si se debe generar una alerta
+        """
+        variacion = cambio['variacion']
+
+        # Filtrar por sentido del cambio
+        if self.direccion == 'sube' and variacion <= 0:
+            return False
+        if self.direccion == 'baja' and variacion >= 0:
+            return False
+
+        if self.variacion_porcentaje is not None and abs(variacion) < self.variacion_porcentaje:
+            return False
+        if self.precio_maximo is not None and cambio['precio_actual'] > self.precio_maximo:
+            return False
+        return True
+
+
+class DestinoArchivo:
+    """Destino de alertas que agrega cada alerta como una línea JSON en un archivo."""
+
+    def __init__(self, ruta="alertas_precios.jsonl"):
+        """
+        Parámetros:
+            ruta (str): Archivo donde se escribirán las alertas
+        """
+        self.ruta = ruta
+
+    def enviar(self, alerta):
+        """Escribe la alerta al final del archivo."""
+        with open(self.ruta, 'a', encoding='utf-8') as archivo:
+            archivo.write(json.dumps(alerta, ensure_ascii=False) + '\n')
+
+
+class DestinoWebhookSimulado:
+    """
+    Destino que simula el envío de alertas a un webhook.
+
+    En lugar de realizar la petición HTTP, guarda el cuerpo que se enviaría
+    y lo muestra por consola.
+    """
+
+    def __init__(self, url):
+        """
+        Parámetros:
+            url (str): URL del webhook (no se contacta)
+        """
+        self.url = url
+        self.enviados = []  # Cuerpos de las peticiones "enviadas"
+
+    def enviar(self, alerta):
+        """Registra la alerta como si se hubiera enviado al webhook."""
+        cuerpo = json.dumps(alerta, ensure_ascii=False)
+        self.enviados.append(cuerpo)
+        print(f"[webhook simulado] POST {self.url}: {cuerpo}")
+
+
+class MonitorPrecios:
+    """Evalúa las reglas de alerta sobre los cambios de cada ejecución y envía las alertas."""
+
+    def __init__(self, historial, reglas, destinos):
+        """
+        Parámetros:
+            historial (HistorialPrecios): Historial de donde se leen los cambios
+            reglas (list): Lista de ReglaAlerta a evaluar
+            destinos (list): Objetos con un método enviar(alerta)
+        """
+        self.historial = historial
+        self.reglas = reglas
+        self.destinos = destinos
+
+    def procesar(self):
+        """
+        Genera y envía las alertas correspondientes a la última ejecución registrada.
+
+        Retorna:
+            list: Alertas generadas
+        """
+        id_ejecucion = self.historial.ultima_ejecucion()
+        # Se parte del umbral más bajo de las reglas para consultar solo los cambios relevantes
+        umbrales = [regla.variacion_porcentaje or 0 for regla in self.reglas]
+        cambios = self.historial.libros_con_variacion(min(umbrales, default=0))
+
+        alertas = []
+        for cambio in cambios:
+            for regla in self.reglas:
+                if regla.evaluar(cambio):
+                    alerta = {
+                        'regla': regla.nombre,
+                        'ejecucion': id_ejecucion,
+                        'titulo': cambio['titulo'],
+                        'enlace': cambio['enlace'],
+                        'precio_anterior': cambio['precio_anterior'],
+                        'precio_actual': cambio['precio_actual'],
+                        'variacion': round(cambio['variacion'], 2)
+                    }
+                    alertas.append(alerta)
+                    # Enviar la alerta a todos los destinos configurados
+                    for destino in self.destinos:
+                        destino.enviar(alerta)
+        return alertas
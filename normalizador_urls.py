@@ -0,0 +1,186 @@
+"""
+Módulo que normaliza URLs y lleva un registro persistente de los recursos ya vistos,
+para no descargar ni mostrar dos veces el mismo recurso.
+Por: Leandro Marquez
+Para: Programación V - UBA
+"""
+
+# Importación de bibliotecas necesarias
+import hashlib  # Para obtener huellas compactas de las URLs
+import os  # Para operaciones del sistema de archivos
+from urllib.parse import urljoin, urlsplit, urlunsplit  # Manejo de URLs
+
+# Parámetros de seguimiento que no identifican el recurso (además de los utm_*)
+PARAMETROS_SEGUIMIENTO = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga', 'igshid'}
+
+# Puertos por defecto que se eliminan de la URL
+PUERTOS_POR_DEFECTO = {'http': 80, 'https': 443}
+
+
+def eliminar_segmentos_punto(ruta):
+    """
+    Resuelve los segmentos '.' y '..' de una ruta (RFC 3986, sección 5.2.4).
+
+    Parámetros:
+        ruta (str): Ruta de la URL (ej: '/a/b/../c')
+
+    Retorna:
+        str: Ruta sin segmentos de punto (ej: '/a/c')
+    """
+    salida = []
+    segmentos = ruta.split('/')
+    for segmento in segmentos:
+        if segmento == '..':
+            # Subir un nivel sin salir de la raíz
+            if len(salida) > 1:
+                salida.pop()
+        elif segmento != '.':
+            salida.append(segmento)
+
+    # Conservar la barra final si la ruta terminaba en un segmento de punto
+    if segmentos[-1] in ('.', '..'):
+        salida.append('')
+    return '/'.join(salida)
+
+
+def es_parametro_seguimiento(parametro):
+    """
+    Indica si un parámetro de la consulta solo sirve para seguimiento.
+
+    Parámetros:
+        parametro (str): Parámetro tal como aparece en la URL (ej: 'utm_source=x')
+
+    Retorna:
+        bool: True si el parámetro no identifica el recurso
+    """
+    clave = parametro.split('=', 1)[0].lower()
+    return clave.startswith('utm_') or clave in PARAMETROS_SEGUIMIENTO
+
+
+def normalizar_url(url, base=None):
+    """
+    Convierte una URL a su forma canónica para poder comparar recursos.
+
+    Pasa el esquema y el host a minúsculas, quita el puerto por defecto, el fragmento,
+    la barra final y los parámetros de seguimiento (utm_*, fbclid, ...), ordena el resto
+    de parámetros y resuelve los segmentos '..' de la ruta. El resultado es una clave
+    de comparación: para mostrar o descargar el recurso se debe usar la URL original.
+    Si la URL está mal formada (puerto inválido, IPv6 sin cerrar, ...) se usa como clave
+    la URL sin espacios ni fragmento.
+
+    Parámetros:
+        url (str): URL absoluta o relativa
+        base (str): URL base para resolver enlaces relativos
+
+    Retorna:
+        str: URL normalizada
+    """
+    try:
+        if base:
+            url = urljoin(base, url.strip())
+        partes = urlsplit(url.strip())
+        puerto = partes.port  # Lanza ValueError si el puerto no es válido
+    except ValueError:
+        # URL mal formada: clave conservadora sin normalizar
+        return url.strip().split('#', 1)[0]
+
+    # Esquema y host no distinguen mayúsculas
+    esquema = partes.scheme.lower()
+    host = (partes.hostname or '').lower()
+    if ':' in host:
+        host = f"[{host}]"  # Las direcciones IPv6 van entre corchetes
+    if puerto and puerto != PUERTOS_POR_DEFECTO.get(esquema):
+        host = f"{host}:{puerto}"
+    if partes.username:
+        credenciales = partes.username + (f":{partes.password}" if partes.password else '')
+        host = f"{credenciales}@{host}"
+
+    # Ruta sin segmentos de punto ni barra final
+    ruta = eliminar_segmentos_punto(partes.path).rstrip('/') or '/'
+
+    # Parámetros sin seguimiento y en orden estable; se conservan tal como aparecen
+    # en la URL (claves sin valor y codificación original)
+    parametros = [parametro for parametro in partes.query.split('&')
+                  if parametro and not es_parametro_seguimiento(parametro)]
+    consulta = '&'.join(sorted(parametros))
+
+    # El fragmento se descarta: apunta al mismo recurso
+    return urlunsplit((esquema, host, ruta, consulta, ''))
+
+
+def huella_url(url, tamano=8):
+    """
+    Obtiene una huella compacta de la forma normalizada de una URL.
+
+    Parámetros:
+        url (str): URL a resumir
+        tamano (int): Cantidad de bytes de la huella
+
+    Retorna:
+        bytes: Huella de la URL
+    """
+    return hashlib.blake2b(normalizar_url(url).encode('utf-8'), digest_size=tamano).digest()
+
+
+class ConjuntoVistos:
+    """
+    Conjunto exacto y persistente de URLs ya vistas.
+
+    En lugar de las URLs completas guarda huellas de 8 bytes, lo que reduce mucho
+    la memoria y el tamaño del archivo manteniendo una probabilidad de colisión despreciable.
+    """
+
+    TAMANO_HUELLA = 8  # Bytes por URL
+
+    def __init__(self, ruta=None):
+        """
+        Crea el conjunto y carga las URLs vistas en ejecuciones anteriores.
+
+        Parámetros:
+            ruta (str): Archivo donde se persiste el conjunto (None para no persistir)
+        """
+        self.ruta = ruta
+        self.huellas = set()
+        self.cargar()
+
+    def cargar(self):
+        """Carga las huellas guardadas en el archivo, si existe."""
+        if not self.ruta or not os.path.exists(self.ruta):
+            return
+        with open(self.ruta, 'rb') as archivo:
+            datos = archivo.read()
+        n = self.TAMANO_HUELLA
+        self.huellas.update(datos[i:i + n] for i in range(0, len(datos) - n + 1, n))
+
+    def guardar(self):
+        """Escribe el conjunto en el archivo de forma atómica."""
+        if not self.ruta:
+            return
+        temporal = self.ruta + '.tmp'
+        with open(temporal, 'wb') as archivo:
+            archivo.write(b''.join(self.huellas))
+        os.replace(temporal, self.ruta)  # Evita dejar un archivo a medio escribir
+
+    def agregar(self, url):
+        """
+        Marca una URL como vista.
+
+        Parámetros:
+            url (str): URL a registrar
+
+        Retorna:
+            bool: True si la URL no se había visto antes
+        """
+        huella = huella_url(url, self.TAMANO_HUELLA)
+        if huella in self.huellas:
+            return False
+        self.huellas.add(huella)
+        return True
+
+    def __contains__(self, url):
+        """Indica si una URL ya fue vista."""
+        return huella_url(url, self.TAMANO_HUELLA) in self.huellas
+
+    def __len__(self):
+        """Cantidad de URLs distintas vistas."""
+        return len(self.huellas)
@@ -0,0 +1,146 @@
+"""
+Pruebas de la integración de asyncio con Tkinter y de las descargas concurrentes.
+Por: Leandro Marquez
+Para: Programación V - UBA
+"""
+
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+import bucle_async
+from bucle_async import BucleAsyncTk, describir_error
+
+
+class RootFalso:
+    """Sustituto de tk.Tk que guarda las llamadas a after() para ejecutarlas a mano."""
+
+    def __init__(self):
+        self.pendientes = []
+
+    def after(self, ms, funcion):
+        self.pendientes.append(funcion)
+        return len(self.pendientes)
+
+    def after_cancel(self, identificador):
+        self.pendientes.clear()
+
+    def avanzar(self):
+        """Simula una vuelta del mainloop de Tkinter."""
+        self.pendientes.pop(0)()
+        time.sleep(0.005)
+
+
+class RespuestaFalsa:
+    """Respuesta mínima con el método raise_for_status de requests.Response."""
+
+    def __init__(self, url, estado=200):
+        self.url = url
+        self.status_code = estado
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"HTTP {self.status_code}", response=self)
+
+
+class TestBucleAsyncTk(unittest.TestCase):
+    """Pruebas de BucleAsyncTk sin necesidad de una pantalla."""
+
+    def setUp(self):
+        self.root = RootFalso()
+        self.bucle = BucleAsyncTk(self.root, max_workers=1)
+        self.llamadas = []
+        self.demora = 0.0
+        parche = mock.patch.object(bucle_async.requests, 'get', side_effect=self.get_falso)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def tearDown(self):
+        if not self.bucle.loop.is_closed():
+            self.bucle.cerrar()
+
+    def get_falso(self, url, headers=None, timeout=None):
+        self.llamadas.append(url)
+        time.sleep(self.demora)
+        return RespuestaFalsa(url, 404 if 'no-existe' in url else 200)
+
+    def ejecutar(self, corrutina, limite=5.0):
+        """Avanza el mainloop simulado hasta que termine la corrutina."""
+        tarea = self.bucle.crear_tarea(corrutina)
+        fin = time.time() + limite
+        while not tarea.done():
+            self.assertLess(time.time(), fin, "la tarea no terminó a tiempo")
+            self.root.avanzar()
+        return tarea.result()
+
+    def test_descarga_exitosa(self):
+        respuesta = self.ejecutar(self.bucle.descargar('http://a.com', timeout=1))
+        self.assertEqual(respuesta.url, 'http://a.com')
+
+    def test_error_http(self):
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.ejecutar(self.bucle.descargar('http://a.com/no-existe', timeout=1))
+
+    def test_tiempo_agotado(self):
+        self.demora = 0.3
+        with self.assertRaises(asyncio.TimeoutError):
+            self.ejecutar(self.bucle.descargar('http://lento.com', timeout=0.05))
+
+    def test_espera_en_cola_no_cuenta_para_el_tiempo_limite(self):
+        # Con un solo hilo la segunda solicitud espera a la primera
+        self.demora = 0.2
+
+        async def dos_descargas():
+            return await asyncio.gather(self.bucle.descargar('http://a.com', timeout=0.3),
+                                        self.bucle.descargar('http://b.com', timeout=0.3))
+
+        respuestas = self.ejecutar(dos_descargas())
+        self.assertEqual([r.url for r in respuestas], ['http://a.com', 'http://b.com'])
+
+    def test_cancelar_solicitud_en_cola(self):
+        self.demora = 0.2
+        primera = self.bucle.crear_tarea(self.bucle.descargar('http://a.com'))
+        segunda = self.bucle.crear_tarea(self.bucle.descargar('http://b.com'))
+        for _ in range(3):
+            self.root.avanzar()
+        primera.cancel()
+        segunda.cancel()
+        while not (primera.done() and segunda.done()):
+            self.root.avanzar()
+        time.sleep(0.3)  # Dar tiempo al hilo para tomar la siguiente solicitud
+
+        self.assertTrue(primera.cancelled())
+        self.assertTrue(segunda.cancelled())
+        self.assertEqual(self.llamadas, ['http://a.com'])
+
+    def test_cerrar_cancela_tareas_y_no_espera_solicitudes(self):
+        self.demora = 1.0
+        tarea = self.bucle.crear_tarea(self.bucle.descargar('http://lento.com'))
+        self.root.avanzar()
+
+        inicio = time.time()
+        self.bucle.cerrar()
+        self.assertLess(time.time() - inicio, 0.5)
+        self.assertTrue(tarea.cancelled())
+        self.assertTrue(self.bucle.loop.is_closed())
+        self.assertEqual(self.root.pendientes, [])
+        self.assertTrue(all(hilo.daemon for hilo in self.bucle.executor.hilos))
+
+
+class TestDescribirError(unittest.TestCase):
+    """Pruebas de las descripciones cortas de errores."""
+
+    def test_descripciones(self):
+        self.assertEqual(describir_error(asyncio.TimeoutError()), "tiempo agotado")
+        self.assertEqual(describir_error(requests.exceptions.ReadTimeout()), "tiempo agotado")
+        error_http = requests.exceptions.HTTPError(response=RespuestaFalsa('http://a.com', 404))
+        self.assertEqual(describir_error(error_http), "HTTP 404")
+        self.assertEqual(describir_error(requests.exceptions.ConnectionError("Max retries...")),
+                         "ConnectionError")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Pruebas del historial de precios y de las alertas de cambios de precio.
+Por: Leandro Marquez
+Para: Programación V - UBA
+"""
+
+import unittest
+
+from historial_precios import HistorialPrecios, MonitorPrecios, ReglaAlerta, DestinoWebhookSimulado
+
+
+def libro(enlace, precio, rating=3):
+    """Crea un libro con el formato que devuelve BookScraperApp.extract_book_data."""
+    return {'title': enlace.upper(), 'price': f"£{precio:.2f}", 'rating': rating, 'link': enlace}
+
+
+class TestHistorialPrecios(unittest.TestCase):
+    """Pruebas del almacén de capturas y del resumen incremental."""
+
+    def setUp(self):
+        self.historial = HistorialPrecios(':memory:')
+
+    def tearDown(self):
+        self.historial.cerrar()
+
+    def test_resumen_incremental_entre_ejecuciones(self):
+        self.historial.registrar_ejecucion([libro('a', 10.0), libro('b', 20.0)])
+        self.historial.registrar_ejecucion([libro('a', 12.0), libro('b', 20.0)])
+        self.historial.registrar_ejecucion([libro('a', 8.0)])
+
+        estadisticas = self.historial.estadisticas('a')
+        self.assertEqual(estadisticas['precio_actual'], 8.0)
+        self.assertEqual(estadisticas['precio_min'], 8.0)
+        self.assertEqual(estadisticas['precio_max'], 12.0)
+        self.assertAlmostEqual(estadisticas['precio_promedio'], 10.0)
+        self.assertEqual(estadisticas['num_capturas'], 3)
+        self.assertEqual([c['precio'] for c in self.historial.historial('a')], [10.0, 12.0, 8.0])
+
+    def test_variacion_solo_de_la_ultima_ejecucion(self):
+        self.historial.registrar_ejecucion([libro('a', 10.0), libro('b', 20.0)])
+        self.historial.registrar_ejecucion([libro('a', 12.0), libro('b', 20.0)])
+
+        cambios = self.historial.libros_con_variacion(0)
+        self.assertEqual([c['enlace'] for c in cambios], ['a'])
+        self.assertAlmostEqual(cambios[0]['variacion'], 20.0)
+
+        # Un libro ausente en la última ejecución no se reporta
+        self.historial.registrar_ejecucion([libro('b', 25.0)])
+        self.assertEqual([c['enlace'] for c in self.historial.libros_con_variacion(0)], ['b'])
+
+    def test_umbral_inclusive(self):
+        self.historial.registrar_ejecucion([libro('a', 10.0)])
+        id_ejecucion = self.historial.registrar_ejecucion([libro('a', 10.5)])  # Exactamente 5%
+
+        self.assertEqual(len(self.historial.libros_con_variacion(5.0)), 1)
+        webhook = DestinoWebhookSimulado('http://ejemplo.com/alertas')
+        monitor = MonitorPrecios(self.historial, [ReglaAlerta('Variación', 5.0)], [webhook])
+        alertas = monitor.procesar()
+        self.assertEqual(len(alertas), 1)
+        self.assertEqual(alertas[0]['ejecucion'], id_ejecucion)
+        self.assertEqual(len(webhook.enviados), 1)
+
+    def test_enlace_repetido_en_una_ejecucion(self):
+        self.historial.registrar_ejecucion([libro('a', 10.0)])
+        self.historial.registrar_ejecucion([libro('a', 15.0), libro('a', 15.0)])
+
+        self.assertEqual(self.historial.estadisticas('a')['num_capturas'], 2)
+        self.assertEqual(len(self.historial.historial('a')), 2)
+        cambios = self.historial.libros_con_variacion(5.0)
+        self.assertEqual(cambios[0]['precio_anterior'], 10.0)
+
+    def test_ejecuciones_con_la_misma_marca_de_tiempo(self):
+        # Con un reloj de baja resolución dos ejecuciones pueden tener la misma marca
+        marca = '2024-01-01T10:00:00.000000'
+        self.historial.registrar_ejecucion([libro('a', 10.0)], marca_tiempo=marca)
+        self.historial.registrar_ejecucion([libro('a', 12.0)], marca_tiempo=marca)
+        self.historial.registrar_ejecucion([libro('a', 14.0)], marca_tiempo='2023-12-31T23:59:59')
+
+        self.assertEqual([c['precio'] for c in self.historial.historial('a')], [10.0, 12.0, 14.0])
+        self.assertEqual(self.historial.estadisticas_ventana('a', capturas=1)['precio_max'], 14.0)
+
+    def test_estadisticas_ventana(self):
+        for precio in (10.0, 20.0, 30.0, 40.0):
+            self.historial.registrar_ejecucion([libro('a', precio)])
+
+        ventana = self.historial.estadisticas_ventana('a', capturas=2)
+        self.assertEqual((ventana['precio_min'], ventana['precio_max']), (30.0, 40.0))
+        self.assertAlmostEqual(ventana['precio_promedio'], 35.0)
+        self.assertIsNone(self.historial.estadisticas_ventana('inexistente'))
+
+
+class TestReglaAlerta(unittest.TestCase):
+    """Pruebas de la evaluación de reglas de alerta."""
+
+    def test_direccion_y_precio_maximo(self):
+        baja = {'variacion': -10.0, 'precio_actual': 9.0}
+        sube = {'variacion': 10.0, 'precio_actual': 11.0}
+
+        self.assertTrue(ReglaAlerta('baja', 5.0, direccion='baja').evaluar(baja))
+        self.assertFalse(ReglaAlerta('baja', 5.0, direccion='baja').evaluar(sube))
+        self.assertFalse(ReglaAlerta('umbral', 15.0).evaluar(sube))
+        self.assertTrue(ReglaAlerta('objetivo', precio_maximo=9.5).evaluar(baja))
+        self.assertFalse(ReglaAlerta('objetivo', precio_maximo=9.5).evaluar(sube))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Pruebas de la normalización de URLs y del registro de URLs ya vistas.
+Por: Leandro Marquez
+Para: Programación V - UBA
+"""
+
+import os
+import tempfile
+import unittest
+
+from normalizador_urls import normalizar_url, ConjuntoVistos
+
+
+class TestNormalizarUrl(unittest.TestCase):
+    """Pruebas de la forma canónica de las URLs."""
+
+    def test_esquema_host_y_puerto(self):
+        self.assertEqual(normalizar_url("HTTPS://Example.COM:443/Blog"), "https://example.com/Blog")
+        self.assertEqual(normalizar_url("http://example.com:8080/"), "http://example.com:8080/")
+        self.assertEqual(normalizar_url("http://example.com"), "http://example.com/")
+
+    def test_ipv6(self):
+        self.assertEqual(normalizar_url("https://[::1]:8080/x"), "https://[::1]:8080/x")
+        self.assertEqual(normalizar_url("https://[::1]:443/x"), "https://[::1]/x")
+
+    def test_fragmento_y_barra_final(self):
+        self.assertEqual(normalizar_url("https://example.com/post/#comentarios"),
+                         "https://example.com/post")
+
+    def test_segmentos_punto(self):
+        self.assertEqual(normalizar_url("https://example.com/a/./b/../c"), "https://example.com/a/c")
+        self.assertEqual(normalizar_url("https://example.com/../../a"), "https://example.com/a")
+        self.assertEqual(normalizar_url("../x/index.html", base="https://books.toscrape.com/catalogue/page-2.html"),
+                         "https://books.toscrape.com/x/index.html")
+
+    def test_parametros_de_seguimiento(self):
+        self.assertEqual(normalizar_url("https://example.com/p?utm_source=tw&UTM_Medium=x&fbclid=1&id=3"),
+                         "https://example.com/p?id=3")
+        self.assertEqual(normalizar_url("https://example.com/p?utm_source=tw"), "https://example.com/p")
+
+    def test_consulta_conserva_forma_original(self):
+        self.assertEqual(normalizar_url("https://example.com/p?b=2&a=1"), "https://example.com/p?a=1&b=2")
+        self.assertEqual(normalizar_url("https://example.com/p?id"), "https://example.com/p?id")
+        self.assertEqual(normalizar_url("https://example.com/p?q=a%20b&amp"),
+                         "https://example.com/p?amp&q=a%20b")
+
+    def test_url_mal_formada(self):
+        self.assertEqual(normalizar_url("http://example.com:99999/a#x"), "http://example.com:99999/a")
+        self.assertEqual(normalizar_url(" http://example.com:abc/ "), "http://example.com:abc/")
+        self.assertEqual(normalizar_url("http://[broken/x"), "http://[broken/x")
+        self.assertEqual(normalizar_url("/a#b", base="http://[broken/"), "/a")
+
+
+class TestConjuntoVistos(unittest.TestCase):
+    """Pruebas del registro persistente de URLs vistas."""
+
+    def test_variantes_de_una_url_cuentan_una_vez(self):
+        vistos = ConjuntoVistos()
+        self.assertTrue(vistos.agregar("https://example.com/post?utm_source=x"))
+        self.assertFalse(vistos.agregar("HTTPS://example.com/post/#inicio"))
+        self.assertIn("https://example.com/post", vistos)
+        self.assertNotIn("https://example.com/otro", vistos)
+        self.assertEqual(len(vistos), 1)
+
+    def test_persistencia_entre_ejecuciones(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "vistos.bin")
+            vistos = ConjuntoVistos(ruta)
+            vistos.agregar("https://example.com/a")
+            vistos.agregar("https://example.com/b")
+            vistos.guardar()
+
+            recargado = ConjuntoVistos(ruta)
+            self.assertEqual(len(recargado), 2)
+            self.assertIn("https://example.com/a", recargado)
+            self.assertFalse(recargado.agregar("https://example.com/b/"))
+
+
+if __name__ == '__main__':
+    unittest.main()